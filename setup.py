@@ -15,7 +15,7 @@ setup(
     package_dir={"": "src"},
     package_data={"": ["*.pdf"]},
     install_requires=[
-        "numpy", "scipy", "matplotlib", "scikit-learn", 'fire'
+        "numpy", "scipy", "matplotlib", "scikit-learn", "joblib", 'fire'
     ],
     classifiers=[
         'Programming Language :: Python :: 3',
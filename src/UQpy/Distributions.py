@@ -69,6 +69,11 @@ class Distribution:
         if not isinstance(dist_name, str) and not (isinstance(dist_name, list) and isinstance(dist_name[0], str)):
             raise ValueError('UQpy error: name must be a string or a list of strings.')
         self.dist_name = dist_name
+        # handlers to the univariate/multivariate distributions, built once and reused by all methods
+        if isinstance(dist_name, str):
+            self._sub_dist = SubDistribution(dist_name=dist_name)
+        else:
+            self._sub_dist = [SubDistribution(dist_name=dist_name_i) for dist_name_i in dist_name]
 
         if copula is not None:
             if not isinstance(copula, str):
@@ -82,7 +87,7 @@ class Distribution:
     def pdf(self, x, params, copula_params=None):
 
         if isinstance(self.dist_name, str):
-            return SubDistribution(dist_name=self.dist_name).pdf(x, params)
+            return self._sub_dist.pdf(x, params)
         elif isinstance(self.dist_name, list):
             if len(x.shape) == 1:
                 x = x.reshape((1, -1))
@@ -90,7 +95,7 @@ class Distribution:
                 raise ValueError('UQpy error: Inconsistent dimensions')
             prod_pdf = 1
             for i in range(len(self.dist_name)):
-                prod_pdf = prod_pdf * SubDistribution(self.dist_name[i]).pdf(x[:, i], params[i])
+                prod_pdf = prod_pdf * self._sub_dist[i].pdf(x[:, i], params[i])
             if self.copula is None:
                 return prod_pdf
             else:
@@ -100,7 +105,7 @@ class Distribution:
     def log_pdf(self, x, params, copula_params=None):
 
         if isinstance(self.dist_name, str):
-            return SubDistribution(dist_name=self.dist_name).log_pdf(x, params)
+            return self._sub_dist.log_pdf(x, params)
         elif isinstance(self.dist_name, list):
             if len(x.shape) == 1:
                 x = x.reshape((1, -1))
@@ -108,7 +113,7 @@ class Distribution:
                 raise ValueError('UQpy error: Inconsistent dimensions')
             sum_log_pdf = 0
             for i in range(len(self.dist_name)):
-                sum_log_pdf = sum_log_pdf + SubDistribution(self.dist_name[i]).log_pdf(x[:, i], params[i])
+                sum_log_pdf = sum_log_pdf + self._sub_dist[i].log_pdf(x[:, i], params[i])
             if self.copula is None:
                 return sum_log_pdf
             else:
@@ -118,7 +123,7 @@ class Distribution:
     def cdf(self, x, params, copula_params=None):
 
         if isinstance(self.dist_name, str):
-            return SubDistribution(dist_name=self.dist_name).cdf(x, params)
+            return self._sub_dist.cdf(x, params)
         elif isinstance(self.dist_name, list):
             if len(x.shape) == 1:
                 x = x.reshape((1, -1))
@@ -127,7 +132,7 @@ class Distribution:
             if self.copula is None:
                 cdfs = np.zeros_like(x)
                 for i in range(len(self.dist_name)):
-                    cdfs[:, i] = SubDistribution(self.dist_name[i]).cdf(x[:, i], params[i])
+                    cdfs[:, i] = self._sub_dist[i].cdf(x[:, i], params[i])
                 return np.prod(cdfs, axis=1)
             else:
                 c, _ = self.copula.evaluate_copula(x=x, dist_params=params, copula_params=copula_params)
@@ -136,7 +141,7 @@ class Distribution:
     def icdf(self, x, params):
 
         if isinstance(self.dist_name, str):
-            return SubDistribution(dist_name=self.dist_name).icdf(x, params)
+            return self._sub_dist.icdf(x, params)
         elif isinstance(self.dist_name, list):
             if len(x.shape) == 1:
                 x = x.reshape((1, -1))
@@ -145,7 +150,7 @@ class Distribution:
             if self.copula is None:
                 icdfs = []
                 for i in range(len(self.dist_name)):
-                    icdfs.append(SubDistribution(self.dist_name[i]).icdf(x[:, i], params[i]))
+                    icdfs.append(self._sub_dist[i].icdf(x[:, i], params[i]))
                 return icdfs
             else:
                 raise AttributeError('Method icdf not defined for distributions with copula.')
@@ -153,14 +158,15 @@ class Distribution:
     def rvs(self, params, nsamples=1):
 
         if isinstance(self.dist_name, str):
-            return SubDistribution(dist_name=self.dist_name).rvs(params, nsamples)
+            return self._sub_dist.rvs(params, nsamples)
         elif isinstance(self.dist_name, list):
             if len(params) != len(self.dist_name):
                 raise ValueError('UQpy error: Inconsistent dimensions')
             if self.copula is None:
-                rvs = np.zeros((nsamples, len(self.dist_name)))
+                # column-major storage, so that each marginal is written and later read as a contiguous column
+                rvs = np.zeros((nsamples, len(self.dist_name)), order='F')
                 for i in range(len(self.dist_name)):
-                    rvs[:, i] = SubDistribution(self.dist_name[i]).rvs(params[i], nsamples)
+                    rvs[:, i] = self._sub_dist[i].rvs(params[i], nsamples)
                 return rvs
             else:
                 raise AttributeError('Method rvs not defined for distributions with copula.')
@@ -168,7 +174,7 @@ class Distribution:
     def fit(self, x):
 
         if isinstance(self.dist_name, str):
-            return SubDistribution(dist_name=self.dist_name).fit(x)
+            return self._sub_dist.fit(x)
         elif isinstance(self.dist_name, list):
             if len(x.shape) == 1:
                 x = x.reshape((1,-1))
@@ -177,7 +183,7 @@ class Distribution:
             if self.copula is None:
                 params_fit = []
                 for i in range(len(self.dist_name)):
-                    params_fit.append(SubDistribution(self.dist_name[i]).fit(x[:, i]))
+                    params_fit.append(self._sub_dist[i].fit(x[:, i]))
                 return params_fit
             else:
                 raise AttributeError('Method fit not defined for distributions with copula.')
@@ -185,7 +191,7 @@ class Distribution:
     def moments(self, params):
 
         if isinstance(self.dist_name, str):
-            return SubDistribution(dist_name=self.dist_name).moments(params)
+            return self._sub_dist.moments(params)
         elif isinstance(self.dist_name, list):
             if len(params) != len(self.dist_name):
                 raise ValueError('UQpy error: Inconsistent dimensions')
@@ -193,7 +199,7 @@ class Distribution:
                 mean, var, skew, kurt = [0]*len(self.dist_name), [0]*len(self.dist_name), [0]*len(self.dist_name), \
                                         [0]*len(self.dist_name),
                 for i in range(len(self.dist_name)):
-                    mean[i], var[i], skew[i], kurt[i] = SubDistribution(self.dist_name[i]).moments(params[i])
+                    mean[i], var[i], skew[i], kurt[i] = self._sub_dist[i].moments(params[i])
                 return mean, var, skew, kurt
             else:
                 raise AttributeError('Method moments not defined for distributions with copula.')
@@ -19,11 +19,11 @@
 
 import copy
 from scipy.spatial.distance import pdist
+from scipy.special import logsumexp
 import random
 from UQpy.Distributions import *
 from UQpy.Utilities import *
 from os import sys
-from inspect import signature
 from functools import partial
 
 
@@ -1403,16 +1403,11 @@ class AKMCS:
             sig = sig.reshape(sig.size, 1)
         sig[sig == 0.] = 0.00001
 
-        t1 = np.tile(g, (self.DoE.shape[0], 1, 1))
-        t2 = np.swapaxes(np.tile(self.DoE, (g.shape[0], 1, 1)), 1, 0)
-
-        dis = np.linalg.norm(t1-t2, axis=2)
+        # Distances between every DoE point and every prediction, by broadcasting
+        dis = np.linalg.norm(g[None, :, :] - self.DoE[:, None, :], axis=2)
         closest_point = np.argmin(dis, axis=0)
-        index = np.vstack([np.arange(g.shape[0]), closest_point]).T
-
-        m = np.tile(self.DoE, (g.shape[0], 1, 1))
 
-        u = (g - m[index[:, 0], index[:, 1], :])**2 + sig**2
+        u = (g - self.DoE[closest_point, :])**2 + sig**2
         rows = u[:, 0].argsort()[(np.size(g) - self.n_add):]
 
         return rows
@@ -1616,45 +1611,23 @@ class MCMC:
             samples[0, :] = self.seed.reshape((-1,))
 
             if self.pdf_target_type == 'marginal_pdf':
-                list_log_p_current = []
-                for j in range(self.dimension):
-                    log_pdf_ = self.log_pdf_target[j]
-                    list_log_p_current.append(log_pdf_(samples[0, j]))
+                # The marginals are independent, so all the component-wise updates of one step are done at once
+                log_pdf_ = self.log_pdf_target
+                scale = np.array(self.pdf_proposal_scale)
+                is_normal = np.array([proposal_j == 'Normal' for proposal_j in self.pdf_proposal_type])
+                log_p_current = log_pdf_(samples[0, :])[0]
                 for i in range(self.nsamples * self.jump - 1 + self.nburn):
-                    for j in range(self.dimension):
-
-                        log_pdf_ = self.log_pdf_target[j]
-
-                        if self.pdf_proposal_type[j] == 'Normal':
-                            candidate = np.random.normal(samples[i, j], self.pdf_proposal_scale[j], size=1)
-                            log_p_candidate = log_pdf_(candidate)
-                            log_p_current = list_log_p_current[j]
-                            log_p_accept = log_p_candidate - log_p_current
-
-                            accept = np.log(np.random.random()) < log_p_accept
+                    candidate = np.where(is_normal, np.random.normal(samples[i, :], scale),
+                                         np.random.uniform(low=samples[i, :] - scale / 2,
+                                                           high=samples[i, :] + scale / 2))
+                    log_p_candidate = log_pdf_(candidate)[0]
+                    log_p_accept = log_p_candidate - log_p_current
 
-                            if accept:
-                                samples[i + 1, j] = candidate
-                                list_log_p_current[j] = log_p_candidate
-                                n_accepts += 1 / self.dimension
-                            else:
-                                samples[i + 1, j] = samples[i, j]
+                    accept = np.log(np.random.random(self.dimension)) < log_p_accept
 
-                        elif self.pdf_proposal_type[j] == 'Uniform':
-                            candidate = np.random.uniform(low=samples[i, j] - self.pdf_proposal_scale[j] / 2,
-                                                          high=samples[i, j] + self.pdf_proposal_scale[j] / 2, size=1)
-                            log_p_candidate = log_pdf_(candidate)
-                            log_p_current = list_log_p_current[j]
-                            log_p_accept = log_p_candidate - log_p_current
-
-                            accept = np.log(np.random.random()) < log_p_accept
-
-                            if accept:
-                                samples[i + 1, j] = candidate
-                                list_log_p_current[j] = log_p_candidate
-                                n_accepts += 1 / self.dimension
-                            else:
-                                samples[i + 1, j] = samples[i, j]
+                    samples[i + 1, :] = np.where(accept, candidate, samples[i, :])
+                    log_p_current = np.where(accept, log_p_candidate, log_p_current)
+                    n_accepts += np.sum(accept) / self.dimension
             else:
                 log_pdf_ = self.log_pdf_target
 
@@ -1846,14 +1819,11 @@ class MCMC:
 
 
         # Define a helper function
-        def compute_log_pdf(x, pdf_func, params=None, copula_params=None):
-            kwargs_ = {}
-            if params is not None:
-                kwargs_['params'] = params
-            if copula_params is not None:
-                kwargs_['copula_params'] = copula_params
-            pdf_value = max(pdf_func(x, **kwargs_), 10 ** (-320))
-            return np.log(pdf_value)
+        def compute_log_pdf(pdf_func, kwargs_):
+            # returns the log of pdf_func as a closure of x only, with the parameters in kwargs_ bound once
+            def log_pdf(x):
+                return np.log(np.clip(np.asarray(pdf_func(x, **kwargs_)), 10 ** (-320), None))
+            return log_pdf
 
         # Either pdf_target or log_pdf_target must be defined
         if (self.pdf_target is None) and (self.log_pdf_target is None):
@@ -1861,7 +1831,7 @@ class MCMC:
                              ' log_pdf_target or pdf_target.')
         # For MMH with pdf_target_type == 'marginals', pdf_target or its log should be lists
         if (self.algorithm == 'MMH') and (self.pdf_target_type == 'marginal_pdf'):
-            kwargs = [{}]*self.dimension
+            kwargs = [{} for _ in range(self.dimension)]
             for j in range(self.dimension):
                 if self.pdf_target_params is not None:
                     kwargs[j]['params'] = self.pdf_target_params[j]
@@ -1873,7 +1843,7 @@ class MCMC:
                     raise ValueError('For MMH algo with pdf_target_type="marginal_pdf", '
                                      'log_pdf_target should be a list')
                 if isinstance(self.log_pdf_target[0], str):
-                    p_js = [Distribution(dist_name=pdf_target_j) for pdf_target_j in self.pdf_target]
+                    p_js = [Distribution(dist_name=pdf_target_j) for pdf_target_j in self.log_pdf_target]
                     try:
                         [p_j.log_pdf(x=self.seed[0, j], **kwargs[j]) for (j, p_j) in enumerate(p_js)]
                         self.log_pdf_target = [partial(p_j.log_pdf, **kwargs[j]) for (j, p_j) in enumerate(p_js)]
@@ -1893,16 +1863,25 @@ class MCMC:
                     p_js = [Distribution(dist_name=pdf_target_j) for pdf_target_j in self.pdf_target]
                     try:
                         [p_j.pdf(x=self.seed[0, j], **kwargs[j]) for (j, p_j) in enumerate(p_js)]
-                        self.log_pdf_target = [partial(compute_log_pdf, pdf_func=p_j.pdf, **kwargs[j])
+                        self.log_pdf_target = [compute_log_pdf(p_j.pdf, kwargs[j])
                                                for (j, p_j) in enumerate(p_js)]
                     except AttributeError:
                         raise AttributeError('pdf_target given as a list of strings must point to Distributions '
                                              'with an existing pdf method.')
                 elif callable(self.pdf_target[0]):
-                    self.log_pdf_target = [partial(compute_log_pdf, pdf_func=pdf_target_j, **kwargs[j])
+                    self.log_pdf_target = [compute_log_pdf(pdf_target_j, kwargs[j])
                                            for (j, pdf_target_j) in enumerate(self.pdf_target)]
                 else:
                     raise ValueError('pdf_target must be a list of strings or a list of callables')
+
+            # Evaluate all the marginals on an (N, dimension) array, one vectorized call per dimension
+            log_pdf_marginals = self.log_pdf_target
+
+            def log_pdf_target(x):
+                x = np.atleast_2d(x)
+                return np.column_stack([np.reshape(log_pdf_j(x[:, j]), (-1, ))
+                                        for (j, log_pdf_j) in enumerate(log_pdf_marginals)])
+            self.log_pdf_target = log_pdf_target
         else:
             kwargs = {}
             if self.pdf_target_params is not None:
@@ -1931,12 +1910,12 @@ class MCMC:
                     p = Distribution(dist_name=self.pdf_target, copula=self.pdf_target_copula)
                     try:
                         p.pdf(x=self.seed[0, :], **kwargs)
-                        self.log_pdf_target = partial(compute_log_pdf, pdf_func=p.pdf, **kwargs)
+                        self.log_pdf_target = compute_log_pdf(p.pdf, kwargs)
                     except AttributeError:
                         raise AttributeError('pdf_target given as a string must point to a Distribution '
                                              'with an existing pdf method.')
                 elif callable(self.pdf_target):
-                    self.log_pdf_target = partial(compute_log_pdf, pdf_func=self.pdf_target, **kwargs)
+                    self.log_pdf_target = compute_log_pdf(self.pdf_target, kwargs)
                 else:
                     raise ValueError('For MH and Stretch, pdf_target must be a callable function, '
                                      'a str or list of str')
@@ -1986,6 +1965,15 @@ class IS:
                              No Default Value: nsamples must be prescribed.
             :type nsamples: int
 
+            :param n_jobs: Number of parallel jobs used to evaluate the target pdf. The samples are split in n_jobs
+                           chunks evaluated with joblib, useful when the target is an expensive python function.
+                           Default: 1 (serial evaluation), -1 uses all the available cores.
+            :type n_jobs: int
+
+            :param random_state: Seed or numpy.random.Generator used when resampling, see numpy.random.default_rng.
+                                 Default: None (global numpy.random state)
+            :type random_state: None, int or numpy.random.Generator
+
         Output:
             :return: IS.samples: Set of generated samples
             :rtype: IS.samples: ndarray
@@ -2000,7 +1988,7 @@ class IS:
     def __init__(self, nsamples=None,
                  pdf_proposal=None, pdf_proposal_params=None,
                  pdf_target=None, log_pdf_target=None, pdf_target_params=None,
-                 pdf_target_copula=None, pdf_target_copula_params=None
+                 pdf_target_copula=None, pdf_target_copula_params=None, n_jobs=1, random_state=None
                  ):
 
         self.nsamples = nsamples
@@ -2011,41 +1999,64 @@ class IS:
         self.pdf_target_params = pdf_target_params
         self.pdf_target_copula = pdf_target_copula
         self.pdf_target_copula_params = pdf_target_copula_params
+        self.n_jobs = n_jobs
+        self._rng = None if random_state is None else np.random.default_rng(random_state)
 
         self.init_is()
 
         # Step 1: sample from proposal
         self.samples = self.sampling_step()
-        # Step 2: weight samples
-        self.unnormalized_log_weights, self.weights = self.weighting_step()
+        # Step 2: weight samples, sets self.unnormalized_log_weights and self.weights
+        self.weighting_step()
 
     def sampling_step(self):
 
-        proposal_pdf_ = Distribution(dist_name=self.pdf_proposal)
-        samples = proposal_pdf_.rvs(params=self.pdf_proposal_params, nsamples=self.nsamples)
+        samples = self._proposal_dist.rvs(params=self.pdf_proposal_params, nsamples=self.nsamples)
         return samples
 
-    def weighting_step(self):
+    def weighting_step(self, out=None):
+        # out: optional ndarray of shape (nsamples, ) in which the normalized weights are written, so that repeated
+        # calls (e.g. within an adaptive IS loop) do not allocate a new array each time
 
         x = self.samples
         # evaluate qs (log_pdf_proposal)
-        proposal_pdf_ = Distribution(dist_name=self.pdf_proposal)
         try:
-            log_qs = proposal_pdf_.log_pdf(x, params=self.pdf_proposal_params)
+            log_qs = self._proposal_dist.log_pdf(x, params=self.pdf_proposal_params)
         except AttributeError:
-            log_qs = np.log(proposal_pdf_.pdf(x, params=self.pdf_proposal_params))
+            log_qs = np.log(self._proposal_dist.pdf(x, params=self.pdf_proposal_params))
         # evaluate ps (log_pdf_target)
-        log_ps = self.log_pdf_target(x)
+        if self.n_jobs == 1:
+            log_ps = self.log_pdf_target(x)
+        else:
+            from joblib import Parallel, delayed, effective_n_jobs
+            # at most one chunk per sample, so that no job gets an empty array
+            chunks = np.array_split(x, min(effective_n_jobs(self.n_jobs), x.shape[0]))
+            # targets such as scipy pdfs return a 0-d value for a chunk of a single row
+            log_ps = np.concatenate([np.reshape(part, (-1,)) for part in Parallel(n_jobs=self.n_jobs)(
+                delayed(self.log_pdf_target)(chunk) for chunk in chunks)])
 
         log_weights = log_ps-log_qs
-        # this rescale is used to avoid having NaN of Inf when taking the exp
-        weights = np.exp(log_weights - max(log_weights))
-        sum_w = np.sum(weights, axis=0)
-        return log_weights, weights/sum_w
-
-    def resample(self, method='multinomial', size=None):
+        if out is None:
+            out = np.empty(log_weights.shape[0])
+        # normalize in log-space to avoid having NaN or Inf when taking the exp, weights sum to 1 up to round-off
+        np.subtract(log_weights, float(logsumexp(log_weights)), out=out)
+        np.exp(out, out=out)
+        # the weights are updated together with the log densities (kept so that diagnostics do not need to evaluate
+        # the pdfs again) and the cumulative weights (reused by every call to resample), so that they stay consistent
+        # when weighting_step is called again
+        self._log_qs, self._log_ps = log_qs, log_ps
+        self.unnormalized_log_weights, self.weights = log_weights, out
+        self._cdf = np.cumsum(out)
+        return log_weights, out
+
+    def effective_sample_size(self):
+        # Kish's effective sample size, computed from the normalized weights
+        return 1. / float(np.dot(self.weights, self.weights))
+
+    def resample(self, method='systematic', size=None):
         from .Utilities import resample
-        return resample(self.samples, self.weights, method=method, size=size)
+        return resample(self.samples, self.weights, method=method, size=size, random_state=self._rng,
+                        cdf=self._cdf)
 
     ################################################################################################################
     # Initialize Importance Sampling.
@@ -2056,21 +2067,31 @@ class IS:
         if self.nsamples is None:
             raise NotImplementedError('Exit code: Number of samples is not defined.')
 
+        # Check n_jobs
+        if not isinstance(self.n_jobs, int) or self.n_jobs == 0:
+            raise ValueError('UQpy error: n_jobs should be a non-zero integer.')
+
         # helper function
-        def compute_log_pdf(x, pdf_func, params, copula_params):
-            kwargs_ = {}
-            if params is not None:
-                kwargs_['params'] = params
-            if copula_params is not None:
-                kwargs_['copula_params'] = copula_params
-            tmp = pdf_func(x, **kwargs_)
-            pdf_value = np.fmax(tmp, 10 ** (-320)*np.ones_like(tmp))
-            return np.log(pdf_value)
+        def compute_log_pdf(pdf_func, kwargs_):
+            # returns the log of pdf_func as a closure of x only, with the parameters in kwargs_ bound once
+            def log_pdf(x):
+                return np.log(np.clip(np.asarray(pdf_func(x, **kwargs_)), 10 ** (-320), None))
+            return log_pdf
+        # Check pdf_proposal_name
+        if self.pdf_proposal is None:
+            raise ValueError('Exit code: A proposal distribution is required.')
+        # can be given as a name or a list of names, transform it to a distribution class
+        if not isinstance(self.pdf_proposal, str) and not (isinstance(self.pdf_proposal, list)
+           and isinstance(self.pdf_proposal[0], str)):
+            raise ValueError('UQpy error: proposal pdf must be given as a str or a list of str')
+        # the proposal is built once and shared by the sampling and weighting steps
+        self._proposal_dist = Distribution(dist_name=self.pdf_proposal)
+
         # Check log_pdf_target, pdf_target
         if (self.pdf_target is None) and (self.log_pdf_target is None):
             raise ValueError('UQpy error: a target pdf must be defined (pdf_target or log_pdf_target).')
         # The code first checks if log_pdf_target is defined, if yes, no need to check pdf_target
-        x_test = Distribution(dist_name=self.pdf_proposal).rvs(params=self.pdf_proposal_params, nsamples=1)
+        x_test = self._proposal_dist.rvs(params=self.pdf_proposal_params, nsamples=1)
         kwargs = {}
         if self.pdf_target_params is not None:
             kwargs['params'] = self.pdf_target_params
@@ -2098,20 +2119,12 @@ class IS:
                 p = Distribution(dist_name=self.pdf_target, copula=self.pdf_target_copula)
                 try:
                     p.pdf(x=x_test, **kwargs)
-                    self.log_pdf_target = partial(compute_log_pdf, pdf_func=p.pdf, **kwargs)
+                    self.log_pdf_target = compute_log_pdf(p.pdf, kwargs)
                 except AttributeError:
                     raise AttributeError('pdf_target given as a string must point to a Distribution '
                                          'with an existing pdf method.')
             # otherwise it may be a function that computes the pdf, then just take the logarithm
             elif callable(self.pdf_target):
-                self.log_pdf_target = partial(compute_log_pdf, pdf_func=self.pdf_target, **kwargs)
+                self.log_pdf_target = compute_log_pdf(self.pdf_target, kwargs)
             else:
                 raise ValueError('pdf_target should be a callable or a string/list of strings.')
-
-        # Check pdf_proposal_name
-        if self.pdf_proposal is None:
-            raise ValueError('Exit code: A proposal distribution is required.')
-        # can be given as a name or a list of names, transform it to a distribution class
-        if not isinstance(self.pdf_proposal, str) and not (isinstance(self.pdf_proposal, list)
-           and isinstance(self.pdf_proposal[0], str)):
-            raise ValueError('UQpy error: proposal pdf must be given as a str or a list of str')
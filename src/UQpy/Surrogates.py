@@ -17,8 +17,15 @@
 
 """This module contains functionality for all the surrogate methods supported in UQpy."""
 
+import threading
 import numpy as np
+from scipy.linalg import cholesky, cho_solve, get_lapack_funcs
+from scipy.spatial.distance import cdist
 from UQpy.Distributions import *
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
 
 
 ########################################################################################################################
@@ -27,6 +34,51 @@ from UQpy.Distributions import *
 ########################################################################################################################
 ########################################################################################################################
 
+# Compiled SROM error and its gradient with respect to the probabilities, same as the NumPy version in SROM.run_srom.
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _srom_error(p0, samples, samples_sq, samples_cross, wd, wm, wc, n, d, m, alpha, prop, r, sort_idx,
+                    cdf_values):
+        e = 0.
+        de = np.zeros(n)
+        res = np.empty(n)
+        if prop[0]:
+            for j in range(d):
+                a0 = 0.
+                for i in range(n):
+                    a0 += p0[sort_idx[i, j]]
+                    res[i] = a0 - cdf_values[i, j]
+                    e += alpha[0] * wd[i, j] * res[i] * res[i]
+                acc = 0.
+                for i in range(n - 1, -1, -1):
+                    acc += 2 * wd[i, j] * res[i]
+                    de[sort_idx[i, j]] += alpha[0] * acc
+        for l in range(2):
+            if prop[l + 1]:
+                powers = samples if l == 0 else samples_sq
+                for j in range(d):
+                    r1 = 0.
+                    for i in range(n):
+                        r1 += p0[i] * powers[i, j]
+                    r1 -= m[l, j]
+                    e += alpha[1] * wm[l, j] * r1 * r1
+                    for i in range(n):
+                        de[i] += alpha[1] * 2 * wm[l, j] * r1 * powers[i, j]
+        if prop[3]:
+            for j in range(d):
+                for k in range(j + 1, d):
+                    r3 = 0.
+                    for i in range(n):
+                        r3 += p0[i] * samples_cross[i, j, k]
+                    r3 -= r[j, k]
+                    e += alpha[2] * wc[k, j] * r3 * r3
+                    for i in range(n):
+                        de[i] += alpha[2] * 2 * wc[k, j] * r3 * samples_cross[i, j, k]
+        return e, de
+else:
+    _srom_error = None
+
+
 class SROM:
 
     """
@@ -90,6 +142,14 @@ class SROM:
 
             :param correlation: Correlation matrix between random variables.
 
+            :param initial_weights: Probabilities of the samples used as starting point of the optimization, e.g.
+                                    SROM.sample_weights of a previous fit on the same samples.
+                                    Default: Uniform probabilities 1/N.
+            :type initial_weights: ndarray or list (float)
+
+            :param verbose: Print progress messages. Default: False
+            :type verbose: boolean
+
         Output:
             :return: SROM.samples: Last column contains the probabilities/weights defining discrete approximation of
                                    continuous random variables.
@@ -101,110 +161,124 @@ class SROM:
 
     def __init__(self, samples=None, cdf_target=None, moments=None, weights_errors=None,
                  weights_distribution=None, weights_moments=None, weights_correlation=None,
-                 properties=None, cdf_target_params=None, correlation=None):
-
-        if type(weights_distribution) is list:
-            self.weights_distribution = np.array(weights_distribution)
-        else:
-            self.weights_distribution = weights_distribution
-
-        if type(weights_moments) is list:
-            self.weights_moments = np.array(weights_moments)
-        else:
-            self.weights_moments = weights_moments
-
-        if type(correlation) is list:
-            self.correlation = np.array(correlation)
-        else:
-            self.correlation = correlation
-
-        if type(moments) is list:
-            self.moments = np.array(moments)
-        else:
-            self.moments = moments
-        if type(samples) is list:
-            self.samples = np.array(samples)
-            self.nsamples = self.samples.shape[0]
-            self.dimension = self.samples.shape[1]
-        else:
-            self.dimension = samples.shape[1]
-            self.samples = samples
-            self.nsamples = samples.shape[0]
-
-        if type(weights_correlation) is list:
-            self.weights_correlation = np.array(weights_correlation)
-        else:
-            self.weights_correlation = weights_correlation
+                 properties=None, cdf_target_params=None, correlation=None, initial_weights=None, verbose=False):
+
+        # Contiguous float64 arrays, so that the objective function works on the same buffers at every call
+        def as_float_array(x):
+            return np.ascontiguousarray(x, dtype=np.float64) if x is not None else None
+
+        self.weights_distribution = as_float_array(weights_distribution)
+        self.weights_moments = as_float_array(weights_moments)
+        self.correlation = as_float_array(correlation)
+        self.moments = as_float_array(moments)
+        self.samples = as_float_array(samples)
+        self.nsamples = self.samples.shape[0]
+        self.dimension = self.samples.shape[1]
+        self.weights_correlation = as_float_array(weights_correlation)
+        self.initial_weights = as_float_array(initial_weights)
 
         self.weights_errors = weights_errors
         self.cdf_target = cdf_target
         self.properties = properties
         self.cdf_target_params = cdf_target_params
+        self.verbose = verbose
         self.init_srom()
         self.sample_weights = self.run_srom()
 
     def run_srom(self):
-        print('UQpy: Performing SROM...')
+        if self.verbose:
+            print('UQpy: Performing SROM...')
         from scipy import optimize
 
-        def f(p0, samples, wd, wm, wc, mar, n, d, m, alpha, para, prop, correlation):
-            e1 = 0.
-            e2 = 0.
-            e22 = 0.
-            e3 = 0.
-            com = np.append(samples, np.transpose(np.matrix(p0)), 1)
-            for j in range(d):
-                srt = com[np.argsort(com[:, j].flatten())]
-                s = srt[0, :, j]
-                a = srt[0, :, d]
-                a0 = np.cumsum(a)
-                marginal = mar[j]
-
-                if prop[0] is True:
-                    for i in range(n):
-                        e1 += wd[i, j] * (a0[0, i] - marginal(s[0, i], para[j])) ** 2
-
-                if prop[1] is True:
-                    e2 += wm[0, j] * (np.sum(np.array(p0) * samples[:, j]) - m[0, j]) ** 2
-
-                if prop[2] is True:
-                    e22 += wm[1, j] * (
-                            np.sum(np.array(p0) * (samples[:, j] * samples[:, j])) - m[1, j]) ** 2
-
-                if prop[3] is True:
-                    for k in range(d):
-                        if k > j:
-                            r = correlation[j, k] * np.sqrt((m[1, j] - m[0, j] ** 2) * (m[1, k] - m[0, k] ** 2)) + \
-                                m[0, j] * m[0, k]
-                            e3 += wc[k, j] * (
-                                    np.sum(np.array(p_) * (
-                                                np.array(samples[:, j]) * np.array(samples[:, k]))) - r) ** 2
-
-            return alpha[0] * e1 + alpha[1] * (e2 + e22) + alpha[2] * e3
-
-        def constraint(x):
-            return np.sum(x) - 1
-
-        def constraint2(y):
-            n = np.size(y)
-            return np.ones(n) - y
-
-        def constraint3(z):
-            n = np.size(z)
-            return z - np.zeros(n)
-
-        cons = ({'type': 'eq', 'fun': constraint}, {'type': 'ineq', 'fun': constraint2},
-                {'type': 'ineq', 'fun': constraint3})
-
-        p_ = optimize.minimize(f, np.zeros(self.nsamples),
-                               args=(self.samples, self.weights_distribution, self.weights_moments,
-                                     self.weights_correlation, self.cdf_target, self.nsamples, self.dimension,
-                                     self.moments, self.weights_errors, self.cdf_target_params, self.properties,
-                                     self.correlation),
-                               constraints=cons, method='SLSQP')
-
-        print('Done!')
-        return p_.x
+        def f(p0, samples, samples_sq, samples_cross, wd, wm, wc, n, d, m, alpha, prop, r, sort_idx, cdf_values):
+            # Returns the error and its gradient with respect to the probabilities p0
+            e1, de1 = 0., np.zeros(n)
+            e2, de2 = 0., np.zeros(n)
+            e22, de22 = 0., np.zeros(n)
+            e3, de3 = 0., np.zeros(n)
+
+            if prop[0]:
+                # Cumulative probabilities of the sorted samples, for all dimensions at once
+                a0 = np.cumsum(p0[sort_idx], axis=0)
+                e1 = np.sum(wd * (a0 - cdf_values) ** 2)
+                # p0[sort_idx[i, j]] contributes to all a0[i:, j]: reversed cumulative sum, mapped back to the samples
+                da0 = np.cumsum((2 * wd * (a0 - cdf_values))[::-1], axis=0)[::-1]
+                de1_sorted = np.zeros((n, d))
+                np.put_along_axis(de1_sorted, sort_idx, da0, axis=0)
+                de1 = np.sum(de1_sorted, axis=1)
+
+            if prop[1]:
+                r1 = np.matmul(p0, samples) - m[0, :]
+                e2 = np.sum(wm[0, :] * r1 ** 2)
+                de2 = np.matmul(samples, 2 * wm[0, :] * r1)
+
+            if prop[2]:
+                r2 = np.matmul(p0, samples_sq) - m[1, :]
+                e22 = np.sum(wm[1, :] * r2 ** 2)
+                de22 = np.matmul(samples_sq, 2 * wm[1, :] * r2)
+
+            if prop[3]:
+                # Estimated E[X_j X_k] for all pairs at once, the error is taken over the pairs k > j with weight
+                # wc[k, j]
+                r3 = np.tensordot(p0, samples_cross, 1) - r
+                w3 = np.triu(wc.T, 1)
+                e3 = np.sum(w3 * r3 ** 2)
+                de3 = np.tensordot(samples_cross, 2 * w3 * r3, 2)
+
+            return alpha[0] * e1 + alpha[1] * (e2 + e22) + alpha[2] * e3, \
+                alpha[0] * de1 + alpha[1] * (de2 + de22) + alpha[2] * de3
+
+        # The compiled error is used when numba is available
+        objective = _srom_error if _srom_error is not None else f
+
+        def softmax(z):
+            p0 = np.exp(z - np.max(z))
+            return p0 / np.sum(p0)
+
+        def f_softmax(z, *args):
+            # The probabilities are parameterized as p0 = softmax(z), so that they are positive and sum to one
+            # without constraints. The gradient is mapped through the Jacobian of the softmax.
+            p0 = softmax(z)
+            e, de = objective(p0, *args)
+            return e, p0 * (de - np.dot(p0, de))
+
+        # The samples and the target marginals do not change during the optimization, so the samples are sorted
+        # once along each dimension and the target cdfs are evaluated once at the sorted samples
+        self._sort_idx = np.argsort(self.samples, axis=0)
+        self._sorted_samples = np.take_along_axis(self.samples, self._sort_idx, axis=0)
+        self._cdf_table = np.zeros((self.nsamples, self.dimension))
+        if self.properties[0]:
+            self._cdf_table = np.column_stack([self.cdf_target[j](self._sorted_samples[:, j],
+                                                                  self.cdf_target_params[j])
+                                               for j in range(self.dimension)]).astype(np.float64)
+
+        # Squares and pairwise products of the samples, the terms of the second order moments
+        self._samples_sq = self.samples * self.samples
+        self._samples_cross = np.zeros((self.nsamples, 0, 0))
+        if self.properties[3]:
+            self._samples_cross = self.samples[:, :, None] * self.samples[:, None, :]
+
+        # Target second order moments E[X_j X_k] given by the correlation
+        r = np.zeros((self.dimension, self.dimension))
+        if self.properties[3]:
+            var = self.moments[1, :] - self.moments[0, :] ** 2
+            r = self.correlation * np.sqrt(np.outer(var, var)) + np.outer(self.moments[0, :], self.moments[0, :])
+
+        # Starting point of the softmax parameters, such that softmax(z0) = initial_weights/sum(initial_weights)
+        z0 = np.log(np.maximum(self.initial_weights, np.finfo(float).tiny))
+        p_ = optimize.minimize(f_softmax, z0 - np.max(z0),
+                               args=(self.samples, self._samples_sq, self._samples_cross,
+                                     self.weights_distribution.astype(np.float64),
+                                     self.weights_moments.astype(np.float64),
+                                     self.weights_correlation.astype(np.float64), self.nsamples, self.dimension,
+                                     np.atleast_2d(self.moments).astype(np.float64), self.weights_errors,
+                                     np.array(self.properties, dtype=bool), r.astype(np.float64), self._sort_idx,
+                                     self._cdf_table),
+                               jac=True, method='L-BFGS-B')
+
+        if self.verbose:
+            print('Done!')
+        return softmax(p_.x)
 
     def init_srom(self):
 
@@ -277,6 +351,12 @@ class SROM:
         if self.weights_correlation.shape != (self.dimension, self.dimension):
             raise NotImplementedError("Size of 'weights for correlation' is not correct")
 
+        # Check initial weights and it's default value
+        if self.initial_weights is None:
+            self.initial_weights = np.full(self.nsamples, 1. / self.nsamples)
+        if self.initial_weights.shape != (self.nsamples, ) or np.any(self.initial_weights < 0):
+            raise NotImplementedError("'initial_weights' should contain a non-negative weight for each sample")
+
         # Check cdf_target
         if len(self.cdf_target) == 1:
             self.cdf_target = self.cdf_target * self.dimension
@@ -300,6 +380,192 @@ class SROM:
 ########################################################################################################################
 ########################################################################################################################
 
+# Compiled correlation models, working directly on x and s without the (nx, ns, d) stack matrix. For each pair
+# (x_i, s_j), the derivative with respect to the k-th coordinate needs the product of the one-dimensional correlations
+# over all other coordinates, which is taken from prefix and suffix products in one pass.
+# flag: 0 -> rx only, 1 -> derivative with respect to params (dr), 2 -> derivative with respect to x (dr).
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _corr_linear(x, s, params, flag, rx, dr):
+        nx, d = x.shape
+        ns = s.shape[0]
+        for i in prange(nx):
+            mk = np.empty(d)
+            prefix = np.empty(d)
+            for j in range(ns):
+                acc = 1.
+                for k in range(d):
+                    mk[k] = max(1. - params[k] * abs(s[j, k] - x[i, k]), 0.)
+                    prefix[k] = acc
+                    acc *= mk[k]
+                rx[i, j] = acc
+                if flag > 0:
+                    suffix = 1.
+                    for k in range(d - 1, -1, -1):
+                        if mk[k] > 0:
+                            if flag == 1:
+                                dr[i, j, k] = -abs(s[j, k] - x[i, k]) * prefix[k] * suffix
+                            else:
+                                dr[i, j, k] = params[k] * np.sign(s[j, k] - x[i, k]) * prefix[k] * suffix
+                        else:
+                            dr[i, j, k] = 0.
+                        suffix *= mk[k]
+
+    # Spherical and Cubic models, with zeta = min{1, theta*d}: f = 1 - 1.5*zeta + 0.5*zeta^3 (Spherical) or
+    # f = 1 - 3*zeta^2 + 2*zeta^3 (Cubic). df/dzeta vanishes at zeta = 1, so no mask is needed for the capped terms.
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _corr_spherical_cubic(x, s, params, cubic, flag, rx, dr):
+        nx, d = x.shape
+        ns = s.shape[0]
+        for i in prange(nx):
+            fk = np.empty(d)
+            dfk = np.empty(d)
+            prefix = np.empty(d)
+            for j in range(ns):
+                acc = 1.
+                for k in range(d):
+                    z = min(1., params[k] * abs(s[j, k] - x[i, k]))
+                    if cubic:
+                        fk[k] = 1. - z * z * (3. - 2. * z)
+                        dfk[k] = 6. * z * (z - 1.)
+                    else:
+                        fk[k] = 1. - z * (1.5 - 0.5 * z * z)
+                        dfk[k] = 1.5 * (z * z - 1.)
+                    prefix[k] = acc
+                    acc *= fk[k]
+                rx[i, j] = acc
+                if flag > 0:
+                    suffix = 1.
+                    for k in range(d - 1, -1, -1):
+                        if flag == 1:
+                            dr[i, j, k] = dfk[k] * abs(s[j, k] - x[i, k]) * prefix[k] * suffix
+                        else:
+                            dr[i, j, k] = -dfk[k] * params[k] * np.sign(s[j, k] - x[i, k]) * prefix[k] * suffix
+                        suffix *= fk[k]
+
+    # Spline model, with zeta = theta*d: f = 1 - 15*zeta^2 + 30*zeta^3 for zeta <= 0.2, 1.25*(1 - zeta)^3 for
+    # 0.2 < zeta < 1 and 0 otherwise.
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _corr_spline(x, s, params, flag, rx, dr):
+        nx, d = x.shape
+        ns = s.shape[0]
+        for i in prange(nx):
+            fk = np.empty(d)
+            dfk = np.empty(d)
+            prefix = np.empty(d)
+            for j in range(ns):
+                acc = 1.
+                for k in range(d):
+                    z = params[k] * abs(s[j, k] - x[i, k])
+                    if z <= 0.2:
+                        fk[k] = 1. + z * z * (30. * z - 15.)
+                        dfk[k] = z * (90. * z - 30.)
+                    elif z < 1.:
+                        fk[k] = 1.25 * (1. - z) * (1. - z) * (1. - z)
+                        dfk[k] = -3.75 * (1. - z) * (1. - z)
+                    else:
+                        fk[k] = 0.
+                        dfk[k] = 0.
+                    prefix[k] = acc
+                    acc *= fk[k]
+                rx[i, j] = acc
+                if flag > 0:
+                    suffix = 1.
+                    for k in range(d - 1, -1, -1):
+                        if flag == 1:
+                            dr[i, j, k] = dfk[k] * abs(s[j, k] - x[i, k]) * prefix[k] * suffix
+                        else:
+                            dr[i, j, k] = -dfk[k] * params[k] * np.sign(s[j, k] - x[i, k]) * prefix[k] * suffix
+                        suffix *= fk[k]
+else:
+    _corr_linear, _corr_spherical_cubic, _corr_spline = None, None, None
+
+
+def _prod_others(f):
+    # Product of f over all the other entries of the last axis, for each entry: prefix times suffix products. The
+    # full product over the last axis comes out of the same prefix products and is returned with it.
+    left, right = np.empty_like(f), np.empty_like(f)
+    left[..., 0], right[..., -1] = 1., 1.
+    np.cumprod(f[..., :-1], axis=-1, out=left[..., 1:])
+    np.cumprod(f[..., :0:-1], axis=-1, out=right[..., -2::-1])
+    return left * right, left[..., -1] * f[..., -1]
+
+
+# Objective value where the correlation matrix is not positive definite. It is larger than the log-likelihood objective
+# at any feasible point, and small enough that unit decreases still pass the relative reduction test of L-BFGS-B.
+_KRIG_PENALTY = 1e6
+
+
+def _krig_infeasible(p0):
+    # Objective and gradient where the correlation matrix cannot be factorized. This happens when the hyperparameters are
+    # too small (all samples strongly correlated, R close to singular), so the large but finite penalty decreases with
+    # log(theta) and its gradient points towards larger hyperparameters. The slope is one in log(theta), so that the
+    # optimizer moves out of the infeasible region in moderate steps instead of jumping to the upper bound. Returning
+    # np.inf with a zero gradient instead makes the L-BFGS-B line search abort.
+    p0 = np.asarray(p0, dtype=np.float64)
+    return _KRIG_PENALTY - np.sum(np.log(p0)), -1 / p0
+
+
+def _krig_log_likelihood(p0, s, m, n, f, y, corr_model, cache=None):
+    # Return the negative concentrated log-likelihood function of Krig and it's analytic gradient. When a cache dict is
+    # given, the last successful (params, Cholesky factor) pair is stored in cache['last'], and the last (ll, grad) in
+    # cache['ll'] is returned again if the optimizer comes back to the same params.
+    if cache is not None:
+        key = np.asarray(p0, dtype=np.float64).tobytes()
+        if 'll' in cache and cache['ll'][0] == key:
+            return cache['ll'][1], cache['ll'][2].copy()
+    r__, dr_ = corr_model(x=s, s=s, params=p0, dt=True)
+    try:
+        cc = cholesky(r__, lower=True)
+    except np.linalg.LinAlgError:
+        return _krig_infeasible(p0)
+
+    # Diagonal terms are negligible sometimes, even when cc exists.
+    if np.min(np.diagonal(cc)) <= 0:
+        return _krig_infeasible(p0)
+    if cache is not None:
+        cache['last'] = (np.array(p0), cc)
+
+    # Generalized least squares estimate of the trend, beta = inv(F^T inv(R) F) F^T inv(R) y
+    r_in_f, r_in_y = cho_solve((cc, True), f), cho_solve((cc, True), y)
+    beta_ = np.linalg.solve(np.matmul(f.T, r_in_f), np.matmul(f.T, r_in_y))
+
+    # alpha = inv(R)*(y - F*beta), process variance sigma^2 = (y - F*beta)^T alpha/m (Eq: 3.13, DACE)
+    alpha = r_in_y - np.matmul(r_in_f, beta_)
+    sigma2 = np.einsum("ik,ik->k", y - np.matmul(f, beta_), alpha) / m
+    if np.min(sigma2) <= 0:
+        return _krig_infeasible(p0)
+    q_ = np.size(y, 1)
+
+    # Objective function:= (m*sum_k log(sigma_k^2) + q*log(det(R)) + constant)/2
+    ll = (m * np.sum(np.log(sigma2)) + q_ * m * (np.log(2 * np.pi) + 1)) / 2 + q_ * np.sum(np.log(np.diagonal(cc)))
+
+    # Gradient:= tr((q*inv(R) - sum_k alpha_k*alpha_k^T/sigma_k^2) dR/dtheta_k)/2. Beta and sigma drop out since they
+    # minimize ll.
+    # inv(R) is formed from the Cholesky factor by LAPACK potri, which fills the lower triangle.
+    potri, = get_lapack_funcs(('potri',), (cc,))
+    r_in, info = potri(cc, lower=True)
+    if info != 0:
+        return _krig_infeasible(p0)
+    r_in = np.tril(r_in) + np.tril(r_in, -1).T
+    # Both matrices are symmetric, so the traces for all theta_k are a single matrix-vector product over the flattened
+    # (m*m) entries.
+    a_ = q_ * r_in - np.matmul(alpha / sigma2, alpha.T)
+    grad = 0.5 * np.matmul(a_.ravel(), dr_.reshape(m * m, -1))
+    if cache is not None:
+        cache['ll'] = (key, ll, grad.copy())
+
+    return ll, grad
+
+
+def _krig_log_likelihood_log(z, *args):
+    # _krig_log_likelihood in terms of z = log(theta), with the gradient from the chain rule. The hyperparameters span
+    # several orders of magnitude, which L-BFGS-B handles much better on a log scale.
+    p0 = np.exp(z)
+    ll, grad = _krig_log_likelihood(p0, *args)
+    return ll, grad * p0
+
+
 class Krig:
     """
             Description:
@@ -331,8 +597,24 @@ class Krig:
                            hyperparamter. Default: 'True'.
                 :type op: boolean
                 :param n_opt: Number of times optimization problem is to be solved with different starting point.
+                              The first start is corr_model_params, the others are drawn by Latin hypercube sampling,
+                              log-uniformly between the bounds.
                               Default: 1
                 :type n_opt: int
+                :param n_jobs: Number of parallel jobs used to run the n_opt optimizations with joblib.
+                               Default: 1 (serial), -1 uses all the available cores.
+                :type n_jobs: int
+                :param verbose: Print progress messages. Default: False
+                :type verbose: boolean
+                :param dtype: Floating point type used to evaluate the built-in NumPy correlation models (float32 or
+                              float64). float32 halves the memory traffic of the (nx, ns, d) evaluations for large
+                              sample sets; the correlation matrix is returned in float64 for the Cholesky
+                              factorization. The rounding in float32 changes the likelihood, so the MLE can end at
+                              different hyperparameters than in float64 and the predictions differ accordingly, and
+                              nearly singular correlation matrices (smooth models with small hyperparameters) may
+                              fail to factorize. The compiled (numba) models always use float64.
+                              Default: numpy.float64
+                :type dtype: numpy dtype
             Output:
                 :return: Krig.interpolate: This function predicts the function value and uncertainty associated with
                                            it at unknown samples.
@@ -343,25 +625,31 @@ class Krig:
     # Last modified: 12/17/2018 by Mohit S. Chauhan
 
     def __init__(self, samples=None, values=None, reg_model=None, corr_model=None, corr_model_params=None, bounds=None,
-                 op=True, n_opt=1):
+                 op=True, n_opt=1, n_jobs=1, verbose=False, dtype=np.float64):
 
-        self.samples = np.array(samples)
-        self.values = np.array(values)
+        self.samples = np.ascontiguousarray(samples, dtype=np.float64)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
         self.reg_model = reg_model
         self.corr_model = corr_model
+        if corr_model_params is not None:
+            corr_model_params = np.ascontiguousarray(corr_model_params, dtype=np.float64)
         self.corr_model_params = corr_model_params
         self.bounds = bounds
         self.n_opt = n_opt
+        self.n_jobs = n_jobs
+        self.verbose = verbose
+        self.dtype = dtype
         self.op = op
-        self.mean_s, self.std_s = np.zeros(samples.shape[1]), np.zeros(samples.shape[1])
-        self.mean_y, self.std_y = np.zeros(values.shape[1]), np.zeros(values.shape[1])
+        self.mean_s, self.std_s = np.zeros(self.samples.shape[1]), np.zeros(self.samples.shape[1])
+        self.mean_y, self.std_y = np.zeros(self.values.shape[1]), np.zeros(self.values.shape[1])
         self.init_krig()
-        self.beta, self.gamma, self.sig, self.F_dash, self.C_inv, self.G = self.run_krig()
+        self.beta, self.gamma, self.sig, self.F_dash, self.C, self.G = self.run_krig()
 
     def run_krig(self):
-        print('UQpy: Performing Krig...')
+        if self.verbose:
+            print('UQpy: Performing Krig...')
         from scipy import optimize
-        from scipy.linalg import cholesky, cho_solve
+        from scipy.linalg import solve_triangular
 
         # Normalizing the data
         self.mean_s, self.std_s = np.mean(self.samples, 0), np.std(self.samples, 0)
@@ -374,105 +662,81 @@ class Krig:
 
         f_, jf_ = self.reg_model(s_)
 
-        def log_likelihood(p0, s, m, n, f, y, re=0):
-            # Return the log-likelihood function and it's gradient. Gradient is calculate using Central Difference
-            r__, dr_ = self.corr_model(x=s, s=s, params=p0, dt=True)
-            try:
-                cc = cholesky(r__, lower=True)
-            except np.linalg.LinAlgError:
-                if re == 0:
-                    return np.inf, np.zeros(n)
-                else:
-                    return np.inf
-
-            # Product of diagonal terms is negligible sometimes, even when cc exists.
-            if np.prod(np.diagonal(cc)) == 0:
-                if re == 0:
-                    return np.inf, np.zeros(n)
-                else:
-                    return np.inf
-
-            # alpha = inv(R)*y
-            alpha = cho_solve((cc, True), y)
-            t4 = np.einsum("ik,ik->k", y, alpha)
-
-            # Objective function:= log(det(R)) + Y^T inv(R) Y + constant
-            ll = (np.log(np.prod(np.diagonal(cc))) + t4 + m * np.log(2 * np.pi)) / 2
-            if re == 1:
-                return ll
-
-            grad1 = np.zeros(n)
-            h = 0.005
-            for dr in range(n):
-                temp = np.zeros(n)
-                temp[dr] = 1
-                low = p0 - h / 2 * temp
-                hi = p0 + h / 2 * temp
-                f_hi = log_likelihood(hi, s, m, n, f, y, 1)
-                f_low = log_likelihood(low, s, m, n, f, y, 1)
-                if f_hi == np.inf or f_low == np.inf:
-                    grad1[dr] = 0
-                else:
-                    grad1[dr] = (f_hi - f_low) / h
+        # Check if F is a full rank matrix, from the diagonal of its triangular QR factor
+        diag_g = np.abs(np.diagonal(np.linalg.qr(f_, mode='r')))
+        if m_ < np.size(f_, 1) or diag_g.min() < np.finfo(float).eps * diag_g.max() * max(f_.shape):
+            raise NotImplementedError("Chosen regression functions are not sufficiently linearly independent")
 
-            return ll, grad1
+        # Last successful Cholesky factor of _krig_log_likelihood, reused below if it is the optimum
+        cache = {}
 
         # Maximum Likelihood Estimation : Solving optimization problem to calculate hyperparameters
         if self.op:
-            sp = self.corr_model_params
-            p = np.zeros([self.n_opt, n_])
-            pf = np.zeros([self.n_opt, 1])
-            for i__ in range(self.n_opt):
-                # print("----------------------------------", i__, "-------------------------------------")
-                p_ = optimize.fmin_l_bfgs_b(log_likelihood, sp, args=(s_, m_, n_, f_, y_), bounds=self.bounds)
-                p[i__, :] = p_[0]
-                pf[i__, 0] = p_[1]
-                # print(i__, p_[0], p_[1])
-                # Generating new starting points using log-uniform distribution
-                if i__ != self.n_opt - 1:
-                    sp = stats.reciprocal.rvs([j[0] for j in self.bounds], [j[1] for j in self.bounds], 1)
-            if min(pf) == np.inf:
+            # Generating new starting points using a Latin hypercube design, log-uniform between the bounds
+            k_ = self.n_opt - 1
+            u = (np.random.rand(k_, n_) + np.array([np.random.permutation(k_) for _ in range(n_)]).T) / max(k_, 1)
+            lb, ub = np.log10(np.array(self.bounds, dtype=float)).T
+            sp = np.vstack((self.corr_model_params, 10 ** (lb + (ub - lb) * u)))
+            # The optimization is carried out over log(theta)
+            args = (s_, m_, n_, f_, y_, self.corr_model, cache)
+            log_bounds = np.log(np.array(self.bounds, dtype=float))
+            if self.n_jobs == 1:
+                results = [optimize.minimize(_krig_log_likelihood_log, np.log(sp_), args=args, jac=True,
+                                             method='L-BFGS-B', bounds=log_bounds) for sp_ in sp]
+            else:
+                from joblib import Parallel, delayed
+                results = Parallel(n_jobs=self.n_jobs)(
+                    delayed(optimize.minimize)(_krig_log_likelihood_log, np.log(sp_), args=args, jac=True,
+                                               method='L-BFGS-B', bounds=log_bounds) for sp_ in sp)
+            p = np.exp(np.array([p_.x for p_ in results]))
+            pf = np.array([p_.fun for p_ in results])
+            # Values of the order of the penalty mean that no start reached a positive definite correlation matrix
+            if min(pf) >= _KRIG_PENALTY / 2:
                 raise NotImplementedError("Maximum likelihood estimator failed: Choose different starting point or "
                                           "increase n_opt")
             t = np.argmin(pf)
             self.corr_model_params = p[t, :]
 
-        r_ = self.corr_model(x=s_, s=s_, params=self.corr_model_params)
-        c = np.linalg.cholesky(r_)                   # Eq: 3.8, DACE
-        c_inv = np.linalg.inv(c)
-        f_dash = np.matmul(c_inv, f_)
-        y_dash = np.matmul(c_inv, y_)
+        if 'last' in cache and np.array_equal(cache['last'][0], self.corr_model_params):
+            c = cache['last'][1]
+        else:
+            r_ = self.corr_model(x=s_, s=s_, params=self.corr_model_params)
+            c = cholesky(r_, lower=True)              # Eq: 3.8, DACE
+        # The cached results are only valid for this fit
+        cache.clear()
+        f_dash = solve_triangular(c, f_, lower=True)
+        y_dash = solve_triangular(c, y_, lower=True)
         q_, g_ = np.linalg.qr(f_dash)                 # Eq: 3.11, DACE
 
-        # Check if F is a full rank matrix
-        if np.linalg.matrix_rank(g_) != min(np.size(f_, 0), np.size(f_, 1)):
-            raise NotImplementedError("Chosen regression functions are not sufficiently linearly independent")
-
         # Design parameters
         beta = np.linalg.solve(g_, np.matmul(np.transpose(q_), y_dash))
-        gamma = np.matmul(np.matmul(np.transpose(c_inv), c_inv), (y_ - np.matmul(f_, beta)))
+        gamma = cho_solve((c, True), y_ - np.matmul(f_, beta))
 
         # Computing the process variance (Eq: 3.13, DACE)
         sigma = np.zeros(q)
         for l in range(q):
             sigma[l] = (1 / m_) * (np.linalg.norm(y_dash[:, l] - np.matmul(f_dash, beta[:, l])) ** 2)
 
-        print('Done!')
-        return beta, gamma, sigma, f_dash, c_inv, g_
+        if self.verbose:
+            print('Done!')
+        return beta, gamma, sigma, f_dash, c, g_
 
     def interpolate(self, x, dy=False):
         x = (x - self.mean_s)/self.std_s
         s_ = (self.samples - self.mean_s) / self.std_s
         fx, jf = self.reg_model(x)
         rx = self.corr_model(x=x, s=s_, params=self.corr_model_params)
-        y = np.einsum('ij,jk->ik', fx, self.beta) + np.einsum('ij,jk->ik', rx, self.gamma)
+        y = np.matmul(fx, self.beta) + np.matmul(rx, self.gamma)
         y = self.mean_y + y * self.std_y
         if dy:
-            r_dash = np.einsum('ij,jk->ik', self.C_inv, rx.T)
-            u = np.einsum('ij,jk->ik', self.F_dash.T, r_dash)-fx.T
-            norm1 = np.sum(r_dash**2, 0)**0.5
-            norm2 = np.sum(np.linalg.solve(self.G, u)**2, 0)**0.5
-            mse = (self.std_y**2)*(self.sig ** 2) * (1 + norm2**2 - norm1**2)
+            from scipy.linalg import solve_triangular
+            r_dash = solve_triangular(self.C, rx.T, lower=True)
+            u = np.matmul(self.F_dash.T, r_dash) - fx.T
+            # G is the upper triangular factor from the QR decomposition in run_krig
+            v = solve_triangular(self.G, u, lower=False)
+            norm1_sq = np.einsum('ij,ij->j', r_dash, r_dash)
+            norm2_sq = np.einsum('ij,ij->j', v, v)
+            mse = (self.std_y**2)*(self.sig ** 2) * (1 + norm2_sq - norm1_sq)
             return y, mse.reshape(y.shape)
         else:
             return y
@@ -482,8 +746,9 @@ class Krig:
         s_ = (self.samples - self.mean_s) / self.std_s
         fx, jf = self.reg_model(x)
         rx, drdx = self.corr_model(x=x, s=s_, params=self.corr_model_params, dx=True)
-        a = np.einsum('ikj,jm->ik', jf, self.beta)
-        b = np.einsum('ijk,jm->ki', drdx.T, self.gamma)
+        # drdx is (nx, ns, d), so the contraction over the samples needs no transpose
+        a = np.matmul(jf, np.sum(self.beta, 1))
+        b = np.tensordot(drdx, np.sum(self.gamma, 1), axes=(1, 0))
         y_grad = (a + b)*self.std_y/self.std_s
         return y_grad
 
@@ -500,213 +765,259 @@ class Krig:
         if self.bounds is None:
             self.bounds = [[0.001, 10**7]]*self.samples.shape[1]
 
-        # Defining Regression model (Linear)
-        def regress(model=None):
-            def r(s):
-                s = np.atleast_2d(s)
-                if model == 'Constant':
-                    fx = np.ones([np.size(s, 0), 1])
-                    jf = np.zeros([np.size(s, 0), np.size(s, 1), 1])
-                    return fx, jf
-                if model == 'Linear':
-                    fx = np.concatenate((np.ones([np.size(s, 0), 1]), s), 1)
-                    jf_b = np.zeros([np.size(s, 0), np.size(s, 1), np.size(s, 1)])
-                    np.einsum('jii->ji', jf_b)[:] = 1
-                    jf = np.concatenate((np.zeros([np.size(s, 0), np.size(s, 1), 1]), jf_b), 2)
-                    return fx, jf
-                if model == 'Quadratic':
-                    fx = np.zeros([np.size(s, 0), int((np.size(s, 1) + 1) * (np.size(s, 1) + 2) / 2)])
-                    jf = np.zeros(
-                        [np.size(s, 0), np.size(s, 1), int((np.size(s, 1) + 1) * (np.size(s, 1) + 2) / 2)])
-                    for i in range(np.size(s, 0)):
-                        temp = np.hstack((1, s[i, :]))
-                        for j in range(np.size(s, 1)):
-                            temp = np.hstack((temp, s[i, j] * s[i, j::]))
-                        fx[i, :] = temp
-                        # definie H matrix
-                        h_ = 0
-                        for j in range(np.size(s, 1)):
-                            tmp_ = s[i, j] * np.eye(np.size(s, 1))
-                            t1 = np.zeros([np.size(s, 1), np.size(s, 1)])
-                            t1[j, :] = s[i, :]
-                            tmp = tmp_ + t1
-                            if j == 0:
-                                h_ = tmp[:, j::]
-                            else:
-                                h_ = np.hstack((h_, tmp[:, j::]))
-                        jf[i, :, :] = np.hstack((np.zeros([np.size(s, 1), 1]), np.eye(np.size(s, 1)), h_))
-                    return fx, jf
-
-            return r
+        if not isinstance(self.n_jobs, int) or self.n_jobs == 0:
+            raise NotImplementedError("Exit code: n_jobs should be a non-zero integer.")
+
+        if np.dtype(self.dtype) not in [np.float32, np.float64]:
+            raise NotImplementedError("Exit code: dtype should be float32 or float64.")
+        dtype = np.dtype(self.dtype)
+
+        # Defining Regression models (Constant, Linear, Quadratic)
+        def reg_constant(s):
+            s = np.atleast_2d(s)
+            fx = np.ones([np.size(s, 0), 1])
+            jf = np.zeros([np.size(s, 0), np.size(s, 1), 1])
+            return fx, jf
+
+        def reg_linear(s):
+            s = np.atleast_2d(s)
+            fx = np.concatenate((np.ones([np.size(s, 0), 1]), s), 1)
+            jf_b = np.zeros([np.size(s, 0), np.size(s, 1), np.size(s, 1)])
+            np.einsum('jii->ji', jf_b)[:] = 1
+            jf = np.concatenate((np.zeros([np.size(s, 0), np.size(s, 1), 1]), jf_b), 2)
+            return fx, jf
+
+        def reg_quadratic(s):
+            s = np.atleast_2d(s)
+            # Quadratic terms s_j*s_k (k >= j), ordered row by row as in the upper triangle
+            iu, ju = np.triu_indices(np.size(s, 1))
+            fx = np.concatenate((np.ones([np.size(s, 0), 1]), s, s[:, iu] * s[:, ju]), 1)
+            # d(s_j*s_k)/ds_l = delta_lj*s_k + delta_lk*s_j
+            jf_b = np.zeros([np.size(s, 0), np.size(s, 1), np.size(iu)])
+            jf_b[:, iu, np.arange(np.size(iu))] += s[:, ju]
+            jf_b[:, ju, np.arange(np.size(iu))] += s[:, iu]
+            jf_a = np.zeros([np.size(s, 0), np.size(s, 1), np.size(s, 1)])
+            np.einsum('jii->ji', jf_a)[:] = 1
+            jf = np.concatenate((np.zeros([np.size(s, 0), np.size(s, 1), 1]), jf_a, jf_b), 2)
+            return fx, jf
+
+        reg_models = {'Constant': reg_constant, 'Linear': reg_linear, 'Quadratic': reg_quadratic}
 
         if type(self.reg_model).__name__ == 'function':
             self.reg_model = self.reg_model
-        elif self.reg_model in ['Constant', 'Linear', 'Quadratic']:
-            self.reg_model = regress(model=self.reg_model)
+        elif isinstance(self.reg_model, str) and self.reg_model in reg_models:
+            self.reg_model = reg_models[self.reg_model]
         else:
             raise NotImplementedError("Exit code: Doesn't recognize the Regression model.")
 
-        # Defining Correlation model (Gaussian Process)
+        # Defining Correlation model (Gaussian Process). Each model is bound to its own evaluation once, which
+        # returns rx and the requested derivative (dR/dtheta if dt, otherwise dR/dx if dx, otherwise None) for a
+        # block of rows of x.
         def corr(model):
-            def c(x, s, params, dt=False, dx=False):
-                rx, drdt, drdx = [0.], [0.], [0.]
-                x = np.atleast_2d(x)
-                # Create stack matrix, where each block is x_i with all s
-                stack = - np.tile(np.swapaxes(np.atleast_3d(x), 1, 2), (1, np.size(s, 0), 1)) + np.tile(s, (
-                    np.size(x, 0),
-                    1, 1))
-                if model == 'Exponential':
-                    rx = np.exp(np.sum(-params * abs(stack), axis=2))
-                    if dt:
-                        drdt = -abs(stack) * np.tile(rx, (np.size(x, 1), 1, 1)).T
-                    if dx:
-                        drdx = params * np.sign(stack) * np.tile(rx.T, (np.size(x, 1), 1, 1)).T
-                elif model == 'Gaussian':
-                    rx = np.exp(np.sum(-params * (stack ** 2), axis=2))
-                    if dt:
-                        drdt = -(stack ** 2) * np.transpose(np.tile(rx, (np.size(x, 1), 1, 1)), (1, 2, 0))
-                    if dx:
-                        drdx = 2 * params * stack * np.transpose(np.tile(rx, (np.size(x, 1), 1, 1)), (1, 2, 0))
-                elif model == 'Linear':
-                    # Taking stack and turning each d value into 1-theta*dij
-                    after_parameters = 1 - params * abs(stack)
-                    # Define matrix of zeros to compare against (not necessary to be defined separately,
-                    # but the line is bulky if this isn't defined first, and it is used more than once)
-                    comp_zero = np.zeros((np.size(x, 0), np.size(s, 0), np.size(s, 1)))
-                    # Compute matrix of max{0,1-theta*d}
-                    max_matrix = np.maximum(after_parameters, comp_zero)
-                    rx = np.prod(max_matrix, 2).T
-                    # Create matrix that has 1s where max_matrix is nonzero
-                    # -Essentially, this acts as a way to store the indices of where the values are nonzero
-                    ones_and_zeros = max_matrix.astype(bool).astype(int)
-                    # Set initial derivatives as if all were positive
-                    first_dtheta = -abs(stack)
-                    first_dx = np.negative(params) * np.sign(stack)
-                    # Multiply derivs by ones_and_zeros...this will set the values where the
-                    # derivative should be zero to zero, and keep all other values the same
-                    drdt = np.multiply(first_dtheta, ones_and_zeros)
-                    drdx = np.multiply(first_dx, ones_and_zeros)
-                    # Loop over parameters, shifting max_matrix and multiplying over derivative
-                    # matrix with each iteration
-                    for i in range(len(params) - 1):
-                        drdt = drdt * np.roll(max_matrix, i + 1, axis=2)
-                        drdx = drdx * np.roll(max_matrix, i + 1, axis=2)
-                elif model == 'Spherical':
-                    # Taking stack and creating array of all thetaj*dij
-                    after_parameters = params * abs(stack)
-                    # Create matrix of all ones to compare
-                    comp_ones = np.ones((np.size(x, 0), np.size(s, 0), np.size(s, 1)))
-                    # zeta_matrix has all values min{1,theta*dij}
-                    zeta_matrix = np.minimum(after_parameters, comp_ones)
-                    # Copy zeta_matrix to another matrix that will used to find where derivative should be zero
-                    indices = zeta_matrix
-                    # If value of min{1,theta*dij} is 1, the derivative should be 0.
-                    # So, replace all values of 1 with 0, then perform the .astype(bool).astype(int)
-                    # operation like in the linear example, so you end up with an array of 1's where
-                    # the derivative should be caluclated and 0 where it should be zero
-                    indices[indices == 1] = 0
-                    # Create matrix of all |dij| (where non zero) to be used in calculation of dR/dtheta
-                    dtheta_derivs = indices.astype(bool).astype(int) * abs(stack)
-                    # Same as above, but for matrix of all thetaj where non-zero
-                    dx_derivs = indices.astype(bool).astype(int) * params * np.sign(stack)
-                    # Initial matrices containing derivates for all values in array. Note since
-                    # dtheta_s and dx_s already accounted for where derivative should be zero, all
-                    # that must be done is multiplying the |dij| or thetaj matrix on top of a
-                    # matrix of derivates w.r.t zeta (in this case, dzeta = -1.5+1.5zeta**2)
-                    drdt = (-1.5 + 1.5 * zeta_matrix ** 2) * dtheta_derivs
-                    drdx = (-1.5 + 1.5 * zeta_matrix ** 2) * dx_derivs
-                    # Also, create matrix for values of equation, 1 - 1.5zeta + 0.5zeta**3, for loop
-                    zeta_function = 1 - 1.5 * zeta_matrix + 0.5 * zeta_matrix ** 3
-                    rx = np.prod(zeta_function, 2).T
-                    # Same as previous example, loop over zeta matrix by shifting index
-                    for i in range(len(params) - 1):
-                        drdt = drdt * np.roll(zeta_function, i + 1, axis=2)
-                        drdx = drdx * np.roll(zeta_function, i + 1, axis=2)
-                elif model == 'Cubic':
-                    # Taking stack and creating array of all thetaj*dij
-                    after_parameters = params * abs(stack)
-                    # Create matrix of all ones to compare
-                    comp_ones = np.ones((np.size(x, 0), np.size(s, 0), np.size(s, 1)))
-                    # zeta_matrix has all values min{1,theta*dij}
-                    zeta_matrix = np.minimum(after_parameters, comp_ones)
-                    # Copy zeta_matrix to another matrix that will used to find where derivative should be zero
-                    indices = zeta_matrix
-                    # If value of min{1,theta*dij} is 1, the derivative should be 0.
-                    # So, replace all values of 1 with 0, then perform the .astype(bool).astype(int)
-                    # operation like in the linear example, so you end up with an array of 1's where
-                    # the derivative should be caluclated and 0 where it should be zero
-                    indices[indices == 1] = 0
-                    # Create matrix of all |dij| (where non zero) to be used in calculation of dR/dtheta
-                    dtheta_derivs = indices.astype(bool).astype(int) * abs(stack)
-                    # Same as above, but for matrix of all thetaj where non-zero
-                    dx_derivs = indices.astype(bool).astype(int) * params * np.sign(stack)
-                    # Initial matrices containing derivates for all values in array. Note since
-                    # dtheta_s and dx_s already accounted for where derivative should be zero, all
-                    # that must be done is multiplying the |dij| or thetaj matrix on top of a
-                    # matrix of derivates w.r.t zeta (in this case, dzeta = -6zeta+6zeta**2)
-                    drdt = (-6 * zeta_matrix + 6 * zeta_matrix ** 2) * dtheta_derivs
-                    drdx = (-6 * zeta_matrix + 6 * zeta_matrix ** 2) * dx_derivs
-                    # Also, create matrix for values of equation, 1 - 1.5zeta + 0.5zeta**3, for loop
-                    zeta_function = 1 - 3 * zeta_matrix ** 2 + 2 * zeta_matrix ** 3
-                    rx = np.prod(zeta_function, 2).T
-                    # Same as previous example, loop over zeta matrix by shifting index
-                    for i in range(len(params) - 1):
-                        drdt = drdt * np.roll(zeta_function, i + 1, axis=2)
-                        drdx = drdx * np.roll(zeta_function, i + 1, axis=2)
-                elif model == 'Spline':
-                    # In this case, the zeta value is just abs(stack)*parameters, no comparison
-                    zeta_matrix = abs(stack) * params
-                    # So, dtheta and dx are just |dj| and theta*sgn(dj), respectively
-                    dtheta_derivs = abs(stack)
-                    # dx_derivs = np.ones((np.size(x,0),np.size(s,0),np.size(s,1)))*parameters
-                    dx_derivs = np.sign(stack) * params
-
-                    # Initialize empty sigma and dsigma matrices
-                    sigma = np.ones((zeta_matrix.shape[0], zeta_matrix.shape[1], zeta_matrix.shape[2]))
-                    dsigma = np.ones((zeta_matrix.shape[0], zeta_matrix.shape[1], zeta_matrix.shape[2]))
-
-                    # Loop over cases to create zeta_matrix and subsequent dR matrices
-                    for i in range(zeta_matrix.shape[0]):
-                        for j in range(zeta_matrix.shape[1]):
-                            for k in range(zeta_matrix.shape[2]):
-                                y = zeta_matrix[i, j, k]
-                                if 0 <= y <= 0.2:
-                                    sigma[i, j, k] = 1 - 15 * y ** 2 + 30 * y ** 3
-                                    dsigma[i, j, k] = -30 * y + 90 * y ** 2
-                                elif 0.2 < y < 1.0:
-                                    sigma[i, j, k] = 1.25 * (1 - y) ** 3
-                                    dsigma[i, j, k] = 3.75 * (1 - y) ** 2 * -1
-                                elif y >= 1:
-                                    sigma[i, j, k] = 0
-                                    dsigma[i, j, k] = 0
-
-                    rx = np.prod(sigma, 2).T
-
-                    # Initialize derivative matrices incorporating chain rule
-                    drdt = dsigma * dtheta_derivs
-                    drdx = dsigma * dx_derivs
-
-                    # Loop over to create proper matrices
-                    for i in range(len(params) - 1):
-                        drdt = drdt * np.roll(sigma, i + 1, axis=2)
-                        drdx = drdx * np.roll(sigma, i + 1, axis=2)
-
-                # Multiplying matrices by ones_and_zeros multiplication sets 0 values equal to
-                # -0.0, so this comparison sets all -0.0 to 0.0 (Python should treat these the
-                # same, but it looks better with 0.0)
-                drdt[drdt == -0.0] = 0.0
-                drdx[drdx == -0.0] = 0.0
-
+            def compiled(kernel, *options):
+                # Compiled kernels fill rx and the derivative in place, using x and s directly. They stream without
+                # (nx, ns, d) temporaries, so they always work in float64.
+                def k(x, s, params, dt, dx):
+                    x, s, params = [np.asarray(a, dtype=np.float64) for a in (x, s, params)]
+                    flag = 1 if dt else (2 if dx else 0)
+                    rx = np.empty((np.size(x, 0), np.size(s, 0)))
+                    dr = np.empty((np.size(x, 0), np.size(s, 0), np.size(s, 1)) if flag else (0, 0, 0))
+                    kernel(x, s, params, *options, flag, rx, dr)
+                    return rx, dr if flag else None
+                return k
+
+            # Working (nx, ns, d) arrays of the NumPy models, as views of one flat buffer that is reused across
+            # calls (blocking over the rows of x keeps it small). Each thread has its own buffer, so that the model
+            # can be evaluated concurrently; the buffers of finished threads are dropped when a new thread comes in.
+            workspace = {}
+
+            def buffers(x, s, k):
+                shape = (k, np.size(x, 0), np.size(s, 0), np.size(s, 1))
+                size = k * np.size(x, 0) * np.size(s, 0) * np.size(s, 1)
+                thread = threading.get_ident()
+                if thread not in workspace:
+                    alive = {t.ident for t in threading.enumerate()}
+                    for t in list(workspace):
+                        if t not in alive:
+                            workspace.pop(t, None)
+                    workspace[thread] = np.empty(0)
+                if workspace[thread].size < size:
+                    workspace[thread] = np.empty(size, dtype=dtype)
+                return workspace[thread][:size].reshape(shape)
+
+            def derivative_factor(stack, abs_stack, params, dt):
+                # Last factor of the derivative of a product model in theta_j*|dij|: d/dtheta_j = |dij| or
+                # d/dx_j = -theta_j*sgn(dij). The dR/dx factor is written over the stack.
+                if dt:
+                    return abs_stack
+                np.sign(stack, out=stack)
+                stack *= -params
+                return stack
+
+            def exponential(x, s, params, dt, dx):
+                # Create stack matrix s_j - x_i by broadcasting
+                stack, abs_stack, work = buffers(x, s, 3)
+                np.subtract(s[None, :, :], x[:, None, :], out=stack)
+                np.abs(stack, out=abs_stack)
+                np.multiply(abs_stack, -params, out=work)
+                rx = np.exp(np.sum(work, axis=-1))
                 if dt:
-                    return rx, drdt
+                    return rx, -abs_stack * rx[:, :, None]
                 if dx:
-                    return rx, drdx
-                return rx
+                    return rx, params * np.sign(stack) * rx[:, :, None]
+                return rx, None
+
+            def gaussian(x, s, params, dt, dx):
+                # Weighted squared distance sum_k params_k*(x_ik - s_jk)**2, as a squared euclidean distance
+                # between scaled samples (the stack is only needed for the derivatives)
+                scale = np.sqrt(params)
+                rx = np.exp(-cdist(x * scale, s * scale, 'sqeuclidean'))
+                if dt:
+                    return rx, -((s[None, :, :] - x[:, None, :]) ** 2) * rx[:, :, None]
+                if dx:
+                    return rx, 2 * params * (s[None, :, :] - x[:, None, :]) * rx[:, :, None]
+                return rx, None
+
+            def linear(x, s, params, dt, dx):
+                stack, abs_stack, max_matrix = buffers(x, s, 3)
+                np.subtract(s[None, :, :], x[:, None, :], out=stack)
+                np.abs(stack, out=abs_stack)
+                # Taking stack and turning each d value into 1-theta*dij, then compute matrix of max{0,1-theta*d}
+                np.multiply(abs_stack, -params, out=max_matrix)
+                max_matrix += 1.
+                np.maximum(max_matrix, 0., out=max_matrix)
+                if not (dt or dx):
+                    return np.prod(max_matrix, axis=-1), None
+                # Products over the other dimensions for each dimension, and rx over all of them. This is common to
+                # dR/dtheta and dR/dx, which only differ in the last factor, with the sign of d(1-theta*d)
+                dr, rx = _prod_others(max_matrix)
+                # Set the values where max_matrix is zero (and the derivative should be zero) to zero
+                dr[max_matrix == 0.] = 0.
+                dr *= derivative_factor(stack, abs_stack, params, dt)
+                np.negative(dr, out=dr)
+                return rx, dr
+
+            def spherical(x, s, params, dt, dx):
+                stack, abs_stack, zeta_matrix, z2, zeta_function = buffers(x, s, 5)
+                np.subtract(s[None, :, :], x[:, None, :], out=stack)
+                np.abs(stack, out=abs_stack)
+                # zeta_matrix has all values min{1,theta*dij} (the scalar bound broadcasts)
+                np.multiply(abs_stack, params, out=zeta_matrix)
+                np.minimum(zeta_matrix, 1., out=zeta_matrix)
+                # Powers of zeta by explicit multiplies
+                np.multiply(zeta_matrix, zeta_matrix, out=z2)
+                # Create matrix for values of equation, 1 - 1.5zeta + 0.5zeta**3, in Horner form
+                np.multiply(z2, 0.5, out=zeta_function)
+                zeta_function -= 1.5
+                zeta_function *= zeta_matrix
+                zeta_function += 1.
+                if not (dt or dx):
+                    return np.prod(zeta_function, axis=-1), None
+                # Products over the other dimensions for each dimension, and rx over all of them
+                dr, rx = _prod_others(zeta_function)
+                # Times the derivative w.r.t zeta (in this case, dzeta = -1.5+1.5zeta**2), which is common to
+                # dR/dtheta and dR/dx, written over zeta_function
+                np.multiply(z2, 1.5, out=zeta_function)
+                zeta_function -= 1.5
+                dr *= zeta_function
+                # If value of min{1,theta*dij} is 1, the derivative should be 0
+                dr[zeta_matrix >= 1.] = 0.
+                dr *= derivative_factor(stack, abs_stack, params, dt)
+                return rx, dr
+
+            def cubic(x, s, params, dt, dx):
+                stack, abs_stack, zeta_matrix, z2, zeta_function = buffers(x, s, 5)
+                np.subtract(s[None, :, :], x[:, None, :], out=stack)
+                np.abs(stack, out=abs_stack)
+                # zeta_matrix has all values min{1,theta*dij} (the scalar bound broadcasts)
+                np.multiply(abs_stack, params, out=zeta_matrix)
+                np.minimum(zeta_matrix, 1., out=zeta_matrix)
+                # Powers of zeta by explicit multiplies
+                np.multiply(zeta_matrix, zeta_matrix, out=z2)
+                # Create matrix for values of equation, 1 - 3zeta**2 + 2zeta**3, in Horner form
+                np.multiply(zeta_matrix, 2., out=zeta_function)
+                zeta_function -= 3.
+                zeta_function *= z2
+                zeta_function += 1.
+                if not (dt or dx):
+                    return np.prod(zeta_function, axis=-1), None
+                # Products over the other dimensions for each dimension, and rx over all of them
+                dr, rx = _prod_others(zeta_function)
+                # Times the derivative w.r.t zeta (in this case, dzeta = -6zeta+6zeta**2), which is common to
+                # dR/dtheta and dR/dx, written over zeta_function
+                np.subtract(z2, zeta_matrix, out=zeta_function)
+                zeta_function *= 6.
+                dr *= zeta_function
+                # If value of min{1,theta*dij} is 1, the derivative should be 0
+                dr[zeta_matrix >= 1.] = 0.
+                dr *= derivative_factor(stack, abs_stack, params, dt)
+                return rx, dr
+
+            def spline(x, s, params, dt, dx):
+                stack, abs_stack, zeta_matrix = buffers(x, s, 3)
+                np.subtract(s[None, :, :], x[:, None, :], out=stack)
+                np.abs(stack, out=abs_stack)
+                # In this case, the zeta value is just abs(stack)*parameters, no comparison
+                np.multiply(abs_stack, params, out=zeta_matrix)
+                # sigma = 1 - 15zeta**2 + 30zeta**3 for zeta <= 0.2, 1.25(1 - zeta)**3 for 0.2 < zeta < 1 and 0
+                # otherwise
+                low, mid = zeta_matrix <= 0.2, zeta_matrix < 1.
+                one_minus = 1. - zeta_matrix
+                sigma = np.select([low, mid], [1. + zeta_matrix * zeta_matrix * (30. * zeta_matrix - 15.),
+                                               1.25 * one_minus * one_minus * one_minus], 0.)
+                if not (dt or dx):
+                    return np.prod(sigma, axis=-1), None
+                # Products over the other dimensions for each dimension, and rx over all of them
+                dr, rx = _prod_others(sigma)
+                # Times the derivative w.r.t zeta, dsigma = -30zeta + 90zeta**2 or -3.75(1 - zeta)**2
+                dr *= np.select([low, mid], [zeta_matrix * (90. * zeta_matrix - 30.), -3.75 * one_minus * one_minus],
+                                0.)
+                dr *= derivative_factor(stack, abs_stack, params, dt)
+                return rx, dr
+
+            # The NumPy models build (nx, ns, d) temporaries and are evaluated over blocks of rows of x; the
+            # Gaussian model only needs them for the derivatives, and the compiled kernels stream.
+            # Each entry holds the evaluation and whether it is blocked without and with derivatives.
+            corr_models = {'Exponential': (exponential, True, True), 'Gaussian': (gaussian, False, True),
+                           'Linear': (linear, True, True), 'Spherical': (spherical, True, True),
+                           'Cubic': (cubic, True, True), 'Spline': (spline, True, True)}
+            if njit is not None:
+                corr_models.update({'Linear': (compiled(_corr_linear), False, False),
+                                    'Spherical': (compiled(_corr_spherical_cubic, False), False, False),
+                                    'Cubic': (compiled(_corr_spherical_cubic, True), False, False),
+                                    'Spline': (compiled(_corr_spline), False, False)})
+            if not isinstance(model, str) or model not in corr_models:
+                raise NotImplementedError("Exit code: Doesn't recognize the Correlation model.")
+            c_block, blocked, blocked_dr = corr_models[model]
+            # Only the NumPy models are evaluated in the chosen dtype, the compiled kernels get the float64 inputs
+            c_dtype = dtype if c_block in (exponential, gaussian, linear, spherical, cubic, spline) else np.float64
+
+            def c(x, s, params, dt=False, dx=False):
+                x = np.ascontiguousarray(np.atleast_2d(x), dtype=c_dtype)
+                s = np.ascontiguousarray(s, dtype=c_dtype)
+                params = np.ascontiguousarray(params, dtype=c_dtype)
+
+                # Evaluate the rows of x in blocks of about 512 kB of workspace each, and of at least 64 rows so that
+                # large sample sets are not evaluated one row at a time
+                block = max(64, 524288 // (x.itemsize * np.size(s, 0) * np.size(s, 1)))
+                if not (blocked_dr if dt or dx else blocked) or np.size(x, 0) <= block:
+                    rx, dr = c_block(x, s, params, dt, dx)
+                else:
+                    out = [c_block(xi, s, params, dt, dx) for xi in np.array_split(x, -(-np.size(x, 0) // block))]
+                    rx = np.concatenate([o[0] for o in out])
+                    dr = np.concatenate([o[1] for o in out]) if dt or dx else None
+                rx = rx.astype(np.float64, copy=False)
+                if dr is None:
+                    return rx
+
+                # Products with zero factors can leave -0.0 values; adding 0.0 turns them into 0.0 in a single pass
+                # (Python should treat these the same, but it looks better with 0.0)
+                dr = dr.astype(np.float64, copy=False)
+                dr += 0.0
+                return rx, dr
             return c
 
         if type(self.corr_model).__name__ == 'function':
             self.corr_model = self.corr_model
-        elif self.corr_model in ['Exponential', 'Gaussian', 'Linear', 'Spherical', 'Cubic', 'Spline', 'Other']:
-            self.corr_model = corr(model=self.corr_model)
         else:
-            raise NotImplementedError("Exit code: Doesn't recognize the Correlation model.")
+            self.corr_model = corr(model=self.corr_model)
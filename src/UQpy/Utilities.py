@@ -406,10 +406,9 @@ def _get_a_plus(a):
     """
 
     eig_val, eig_vec = np.linalg.eig(a)
-    q = np.matrix(eig_vec)
-    x_diagonal = np.matrix(np.diag(np.maximum(eig_val, 0)))
+    x_diagonal = np.diag(np.maximum(eig_val, 0))
 
-    return q * x_diagonal * q.T
+    return np.matmul(np.matmul(eig_vec, x_diagonal), eig_vec.T)
 
 
 def _get_ps(a, w=None):
@@ -421,9 +420,10 @@ def _get_ps(a, w=None):
 
     """
 
-    w05 = np.matrix(w ** .5)
+    w05 = w ** .5
+    w05_inv = np.linalg.inv(w05)
 
-    return w05.I * _get_a_plus(w05 * a * w05) * w05.I
+    return np.matmul(np.matmul(w05_inv, _get_a_plus(np.matmul(np.matmul(w05, a), w05))), w05_inv)
 
 
 def _get_pu(a, w=None):
@@ -437,7 +437,7 @@ def _get_pu(a, w=None):
 
     a_ret = np.array(a.copy())
     a_ret[w > 0] = np.array(w)[w > 0]
-    return np.matrix(a_ret)
+    return a_ret
 
 
 def nearest_psd(a, nit=10):
@@ -884,7 +884,7 @@ def diagnostics(sampling_method, sampling_outputs=None, samples=None, weights=No
         if sampling_outputs is not None:
             weights = sampling_outputs.weights
         print('Diagnostics for Importance Sampling \n')
-        effective_sample_size = 1/np.sum(weights**2, axis=0)
+        effective_sample_size = 1/float(np.dot(weights, weights))
         print('Effective sample size is ne={}, out of a total number of samples={} \n'.
               format(effective_sample_size,np.size(weights)))
         print('max_weight = {}, min_weight = {} \n'.format(max(weights), min(weights)))
@@ -959,20 +959,56 @@ def diagnostics(sampling_method, sampling_outputs=None, samples=None, weights=No
     return fig, ax
 
 
-def resample(samples, weights, method='multinomial', size=None):
+def resample(samples, weights, method='systematic', size=None, random_state=None, cdf=None):
+    """
+        Description: Resample a set of weighted samples (e.g. the output of importance sampling)
+
+        Input:
+            :param samples: samples to be resampled
+            :type samples: ndarray of shape (nsamples, dimension)
+
+            :param weights: normalized weights of the samples
+            :type weights: ndarray of shape (nsamples, )
+
+            :param method: resampling method, 'systematic' (default), 'stratified' or 'multinomial'. Systematic and
+                           stratified resampling invert the cdf of the weights at size ordered points, which has
+                           lower variance than multinomial resampling.
+            :type method: str
+
+            :param size: number of samples to draw, default is nsamples
+            :type size: int
+
+            :param random_state: seed or generator used to draw the random numbers, see numpy.random.default_rng.
+                                 Default: None, the random numbers are drawn from the global numpy.random state
+            :type random_state: None, int or numpy.random.Generator
+
+            :param cdf: cumulative sum of the weights, computed from weights if not provided. Passing it avoids
+                        recomputing it when resampling several times from the same weights.
+            :type cdf: ndarray of shape (nsamples, )
+
+        Output:
+            :return: resampled samples
+            :rtype: ndarray of shape (size, dimension)
+    """
     nsamples = samples.shape[0]
     if size is None:
         size = nsamples
+    if cdf is None:
+        cdf = np.cumsum(weights)
+    rng = np.random if random_state is None else np.random.default_rng(random_state)
     if method == 'multinomial':
-        multinomial_run = np.random.multinomial(size, weights, size=1)[0]
-        idx = list()
-        for j in range(nsamples):
-            if multinomial_run[j] > 0:
-                idx.extend([j for _ in range(multinomial_run[j])])
-        output = samples[idx, :]
-        return output
+        u = rng.random(size)
+    elif method == 'systematic':
+        u = (np.arange(size) + rng.random()) / size
+    elif method == 'stratified':
+        u = (np.arange(size) + rng.random(size)) / size
     else:
-        raise ValueError('Exit code: Current available method: multinomial')
+        raise ValueError('Exit code: Current available methods: systematic, stratified, multinomial')
+    # invert the cdf of the weights, guarding against round-off in its last value
+    idx = np.minimum(np.searchsorted(cdf, u, side='right'), nsamples - 1)
+    output = np.empty((size, samples.shape[1]), dtype=samples.dtype)
+    np.take(samples, idx, axis=0, out=output)
+    return output
 
 
 @contextmanager
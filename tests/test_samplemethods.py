@@ -0,0 +1,32 @@
+import numpy as np
+from scipy import stats
+
+from UQpy.SampleMethods import IS
+
+
+def test_is_parallel_target_weights():
+    # The target is evaluated in chunks of a single row here, for which the scipy pdf returns a 0-d value
+    def pdf_target(x, params=None):
+        return stats.multivariate_normal.pdf(x, mean=np.zeros(2), cov=np.eye(2))
+
+    weights = []
+    for n_jobs in [1, 4]:
+        np.random.seed(0)
+        x = IS(nsamples=3, pdf_proposal=['Normal', 'Normal'], pdf_proposal_params=[[0, 2], [0, 2]],
+               pdf_target=pdf_target, n_jobs=n_jobs)
+        weights.append(x.weights)
+    assert np.allclose(weights[0], weights[1])
+
+
+def test_is_weighting_step_updates_weights():
+    # A new call to weighting_step (e.g. after changing the samples) must update the weights used by
+    # effective_sample_size together with the cumulative weights used by resample
+    np.random.seed(0)
+    x = IS(nsamples=100, pdf_proposal=['Normal', 'Normal'], pdf_proposal_params=[[0, 2], [0, 2]],
+           log_pdf_target=lambda x, params=None: -0.5 * np.sum(x ** 2, axis=1))
+    x.samples = x.samples[::-1] * 0.5
+    out = np.empty(100)
+    log_weights, weights = x.weighting_step(out=out)
+    assert x.weights is out and np.array_equal(x.unnormalized_log_weights, log_weights)
+    assert np.allclose(x._cdf, np.cumsum(x.weights))
+    assert np.isclose(x.effective_sample_size(), 1. / np.sum(out ** 2))
@@ -0,0 +1,57 @@
+import numpy as np
+
+from UQpy.Surrogates import Krig, _krig_log_likelihood
+
+
+def test_krig_gaussian_mle_from_default_start():
+    # With the default starting point [1, 1] the correlation matrix of these samples is numerically singular. The
+    # maximum likelihood estimation has to move out of this region and reach the optimum of a grid search.
+    rng = np.random.default_rng(0)
+    samples = (np.stack(np.meshgrid(np.arange(5), np.arange(5)), -1).reshape(-1, 2) + rng.random((25, 2))) / 5
+    values = (np.sin(3 * samples[:, 0]) + np.cos(2 * samples[:, 1])).reshape(-1, 1)
+    np.random.seed(0)
+    k = Krig(samples=samples, values=values, reg_model='Linear', corr_model='Gaussian', n_opt=1)
+
+    s_ = (samples - k.mean_s) / k.std_s
+    y_ = (values - k.mean_y) / k.std_y
+    f_ = k.reg_model(s_)[0]
+
+    def ll(p):
+        return _krig_log_likelihood(np.asarray(p, dtype=float), s_, 25, 2, f_, y_, k.corr_model)[0]
+
+    grid = 10 ** np.linspace(-3, 1, 41)
+    grid_best = min(ll([a, b]) for a in grid for b in grid)
+    assert not np.allclose(k.corr_model_params, [1, 1])
+    assert ll(k.corr_model_params) <= grid_best + 1e-2 * abs(grid_best)
+
+
+def test_krig_float32_predictions():
+    # float32 only rounds the evaluation of the correlation models, so the predictions stay within 1e-3 (relative to
+    # the range of the values) of the float64 ones
+    rng = np.random.default_rng(0)
+    samples = rng.random((60, 3))
+    values = (np.sin(3 * samples[:, 0]) + samples[:, 1] ** 2 - samples[:, 2]).reshape(-1, 1)
+    x = rng.random((200, 3))
+    y = []
+    for dtype in [np.float64, np.float32]:
+        np.random.seed(1)
+        k = Krig(samples=samples, values=values, reg_model='Linear', corr_model='Exponential', n_opt=1, dtype=dtype)
+        y.append(k.interpolate(x))
+    assert y[1].dtype == np.float64
+    assert np.max(np.abs(y[1] - y[0])) <= 1e-3 * np.ptp(values)
+
+
+def test_krig_concurrent_interpolate():
+    # The NumPy correlation models reuse their working arrays, which must not be shared between threads
+    from concurrent.futures import ThreadPoolExecutor
+    rng = np.random.default_rng(0)
+    samples = rng.random((200, 4))
+    values = (np.sin(3 * samples[:, 0]) + samples[:, 1] * samples[:, 2] - samples[:, 3]).reshape(-1, 1)
+    k = Krig(samples=samples, values=values, reg_model='Linear', corr_model='Exponential',
+             corr_model_params=[1., 1., 1., 1.], op=False)
+    x = [rng.random((1000, 4)) for _ in range(8)]
+    serial = [k.interpolate(x_) for x_ in x]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        threaded = list(pool.map(k.interpolate, x))
+    for y, y_ in zip(serial, threaded):
+        assert np.array_equal(y, y_)